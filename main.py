@@ -1,8 +1,26 @@
 import json
+import numpy as np
 from ortools.sat.python import cp_model
 import collections
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Réglages de la recherche, surchargeables par instance dans "parametres_solveur".
+# Les valeurs par défaut sont celles de CP-SAT.
+REGLAGES_SOLVEUR_PAR_DEFAUT = {
+    "linearization_level": 1,
+    "cp_model_probing_level": 2,
+    "symmetry_level": 2,
+    "core_minimization_level": 2,
+    "boolean_encoding_level": 1,
+    "use_phase_saving": True,
+    "optimize_with_core": False,
+}
+
 def load_config(config_path="schedule_config.json"):
     """
     Charge la configuration depuis un fichier JSON.
@@ -48,7 +66,7 @@ def validate_config(config):
     errors = []
     
     # Vérifier que tous les professeurs peuvent enseigner des matières existantes
-    matieres_existantes = set(config["matieres"].keys())
+    matieres_existantes = config["matieres"].keys()
     for prof_nom, prof_info in config["professeurs"].items():
         for matiere in prof_info["matieres_enseignees"]:
             if matiere not in matieres_existantes:
@@ -101,16 +119,100 @@ def validate_config(config):
             if creneaux_disponibles < cours_par_groupe:
                 errors.append(f"Niveau {niveau}: {cours_par_groupe} cours par groupe mais seulement {creneaux_disponibles} créneaux disponibles")
     
+    # Vérifier les réglages optionnels du solveur (types et noms de stratégie)
+    params = config["parametres_solveur"]
+    for champ, defaut in REGLAGES_SOLVEUR_PAR_DEFAUT.items():
+        valeur = params.get(champ, defaut)
+        if isinstance(defaut, bool):
+            if not isinstance(valeur, bool):
+                errors.append(f"Le paramètre solveur '{champ}' doit être un booléen (reçu: {valeur!r})")
+        elif isinstance(valeur, bool) or not isinstance(valeur, int):
+            errors.append(f"Le paramètre solveur '{champ}' doit être un entier (reçu: {valeur!r})")
+    
+    num_workers = params.get("num_workers", 8)
+    if isinstance(num_workers, bool) or not isinstance(num_workers, int) or num_workers < 1:
+        errors.append(f"Le paramètre solveur 'num_workers' doit être un entier positif (reçu: {num_workers!r})")
+    
+    if not isinstance(params.get("warm_start", True), bool):
+        errors.append(f"Le paramètre solveur 'warm_start' doit être un booléen (reçu: {params['warm_start']!r})")
+    
+    strategies = [nom for nom in dir(cp_model.CpSolver().parameters.SearchBranching) if nom.isupper()]
+    strategie = params.get("search_branching", "AUTOMATIC_SEARCH")
+    if strategie not in strategies:
+        errors.append(f"Stratégie de branchement '{strategie}' inconnue (valeurs possibles: {strategies})")
+    
     return errors
 
+def greedy_assign(cours_a_planifier, avail_slots, profs_for_matiere, salles_for_type, infos_matieres, creneaux_autorises):
+    """
+    Affecte les cours un par un au premier (prof, salle, créneau) libre et compatible.
+    Les créneaux sont des indices sur la ligne de temps aplatie.
+    Retourne {cours_id: (prof, salle, creneau)}; les cours non placés sont absents.
+    """
+    affectation = {}
+    occupes = set()
+    
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        salles_compatibles = salles_for_type[infos_matieres[matiere]['salle_requise']]
+        for prof in profs_for_matiere[matiere]:
+            for creneau in avail_slots[prof]:
+                if (creneau not in creneaux_autorises[groupe]
+                        or ("groupe", groupe, creneau) in occupes
+                        or ("prof", prof, creneau) in occupes):
+                    continue
+                salle = next((s for s in salles_compatibles if ("salle", s, creneau) not in occupes), None)
+                if salle is None:
+                    continue
+                affectation[cours_id] = (prof, salle, creneau)
+                occupes.update({("groupe", groupe, creneau), ("prof", prof, creneau), ("salle", salle, creneau)})
+                break
+            if cours_id in affectation:
+                break
+    
+    return affectation
+
+def analyser_contraintes_niveaux(config, cours_par_niveau, profs_for_matiere, prof_jours_off, prof_heures_off):
+    """
+    Affiche, pour chaque niveau, les créneaux autorisés et les professeurs
+    disponibles par matière, pour aider à comprendre une absence de solution.
+    """
+    jours = config["planning"]["jours"]
+    heures = config["planning"]["heures"]
+    
+    print("\n--- Analyse des contraintes par niveau ---")
+    for niveau, curriculum_info in config["curriculum"].items():
+        print(f"\n🎓 Niveau {niveau}:")
+        jours_autorises = curriculum_info.get("jours_autorises", jours)
+        heures_autorisees = curriculum_info.get("heures_autorisees", heures)
+        creneaux_disponibles = len(jours_autorises) * len(heures_autorisees)
+        
+        print(f"   Créneaux disponibles: {creneaux_disponibles}")
+        print(f"   Jours autorisés: {', '.join(jours_autorises)}")
+        print(f"   Heures autorisées: {', '.join(heures_autorisees)}")
+        
+        # Les compatibilités pré-calculées pour le modèle sont réutilisées ici
+        for matiere, cours_matiere in cours_par_niveau[niveau].items():
+            profs_competents = profs_for_matiere[matiere]
+            
+            # Vérifier les professeurs disponibles sur les créneaux du niveau
+            profs_disponibles = []
+            for prof in profs_competents:
+                jours_prof_ok = [j for j in jours_autorises if j not in prof_jours_off[prof]]
+                heures_prof_ok = [h for h in heures_autorisees if h not in prof_heures_off[prof]]
+                if jours_prof_ok and heures_prof_ok:
+                    profs_disponibles.append(f"{prof}({len(jours_prof_ok)}j×{len(heures_prof_ok)}h)")
+            
+            print(f"   {matiere}: {cours_matiere} cours, {len(profs_competents)} prof(s) → {len(profs_disponibles)} disponible(s): {', '.join(profs_disponibles) if profs_disponibles else 'AUCUN!'}")
+
 def create_schedule_from_config(config_path="schedule_config.json"):
     """
     Génère un emploi du temps à partir d'un fichier de configuration JSON.
+    Retourne la solution (None si aucune) et la configuration chargée.
     """
     # Chargement de la configuration
     config = load_config(config_path)
     if not config:
-        return
+        return None, config
     
     # Validation de la configuration
     errors = validate_config(config)
@@ -118,7 +220,7 @@ def create_schedule_from_config(config_path="schedule_config.json"):
         print("❌ Erreurs dans la configuration:")
         for error in errors:
             print(f"  - {error}")
-        return
+        return None, config
     
     print(f"📚 Génération de l'emploi du temps pour {config['etablissement']['nom']}")
     print(f"    Année scolaire: {config['etablissement']['annee_scolaire']}")
@@ -134,14 +236,15 @@ def create_schedule_from_config(config_path="schedule_config.json"):
     # Génération des cours à planifier
     cours_a_planifier = generate_cours_from_config(config)
     
-    liste_salles = list(salles.keys())
-    liste_professeurs = list(professeurs.keys())
+    # Ordre figé des salles et professeurs: leur position sert de valeur aux variables du modèle
+    liste_salles = tuple(salles)
+    liste_professeurs = tuple(professeurs)
 
     print(f"📊 Statistiques:")
     print(f"   - {len(groupes_eleves)} groupes d'élèves")
     print(f"   - {len(cours_a_planifier)} cours à planifier")
-    print(f"   - {len(liste_professeurs)} professeurs")
-    print(f"   - {len(liste_salles)} salles")
+    print(f"   - {len(professeurs)} professeurs")
+    print(f"   - {len(salles)} salles")
     print(f"   - {len(jours) * len(heures)} créneaux au total")
     
     # Afficher les contraintes par niveau
@@ -162,93 +265,166 @@ def create_schedule_from_config(config_path="schedule_config.json"):
     # MODÈLE ET VARIABLES
     # ------------------
     model = cp_model.CpModel()
-    assignments = {}
-    
+    # Les noms explicites ne servent qu'au débogage du modèle
+    debug_names = config["parametres_solveur"].get("debug_names", False)
+    
+    # Les créneaux (jour, heure) sont aplatis sur une ligne de temps unique
+    creneaux = [(j, h) for j in jours for h in heures]
+    creneau_index = {c: i for i, c in enumerate(creneaux)}
+    nb_creneaux = len(creneaux)
+    prof_index = {p: i for i, p in enumerate(liste_professeurs)}
+    salle_index = {s: i for i, s in enumerate(liste_salles)}
+    
+    # Pré-calcul des compatibilités, pour n'itérer que sur les combinaisons valides
+    profs_for_matiere = {m: [p for p in professeurs if m in professeurs[p]] for m in infos_matieres}
+    
+    salle_type = {s: salles[s]['type'] for s in salles}
+    matiere_salle_req = {m: infos_matieres[m]['salle_requise'] for m in infos_matieres}
+    
+    salles_for_type = collections.defaultdict(list)
+    for salle in salles:
+        salles_for_type[salle_type[salle]].append(salle)
+    
+    prof_jours_off = {p: frozenset(config["professeurs"][p]["contraintes"]["jours_indisponibles"]) for p in professeurs}
+    prof_heures_off = {p: frozenset(config["professeurs"][p]["contraintes"]["heures_indisponibles"]) for p in professeurs}
+    
+    avail_slots = {}
+    for prof in professeurs:
+        indispo_j = prof_jours_off[prof]
+        indispo_h = prof_heures_off[prof]
+        avail_slots[prof] = [i for i, (j, h) in enumerate(creneaux) if j not in indispo_j and h not in indispo_h]
+    
+    # Nombre de cours par niveau et par matière
+    niveau_par_groupe = {g["nom"]: g["niveau"] for g in config["groupes_eleves"]}
+    cours_par_niveau = collections.defaultdict(collections.Counter)
     for (groupe, matiere, cours_id) in cours_a_planifier:
-        # Récupérer le niveau du groupe pour les contraintes horaires
-        niveau_groupe = None
-        for groupe_info in config["groupes_eleves"]:
-            if groupe_info["nom"] == groupe:
-                niveau_groupe = groupe_info["niveau"]
-                break
-        
-        # Récupérer les contraintes horaires du niveau
-        curriculum_niveau = config["curriculum"].get(niveau_groupe, {})
+        cours_par_niveau[niveau_par_groupe[groupe]][matiere] += 1
+    
+    # Créneaux autorisés par les contraintes horaires du niveau de chaque groupe
+    creneaux_autorises = {}
+    for groupe_info in config["groupes_eleves"]:
+        curriculum_niveau = config["curriculum"].get(groupe_info["niveau"], {})
         jours_autorises = curriculum_niveau.get("jours_autorises", jours)
         heures_autorisees = curriculum_niveau.get("heures_autorisees", heures)
+        creneaux_autorises[groupe_info["nom"]] = {creneau_index[(j, h)] for j in jours_autorises for h in heures_autorisees}
+    
+    # Couples (prof, créneau) de chaque cours où le professeur est compétent et
+    # disponible, sur un créneau autorisé pour le niveau du groupe
+    couples_prof_creneau = {}
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        creneaux_groupe = creneaux_autorises[groupe]
+        couples_prof_creneau[cours_id] = [(prof_index[prof], c)
+                                          for prof in profs_for_matiere[matiere]
+                                          for c in avail_slots[prof] if c in creneaux_groupe]
+    
+    # Un cours sans aucun couple possible rend l'emploi du temps impossible
+    cours_impossibles = sorted({(groupe, matiere) for (groupe, matiere, cours_id) in cours_a_planifier
+                                if not couples_prof_creneau[cours_id]})
+    if cours_impossibles:
+        print("❌ Aucune solution possible: cours impossibles à placer")
+        for groupe, matiere in cours_impossibles:
+            print(f"  - {groupe} / {matiere}: aucun professeur compétent disponible sur un créneau autorisé")
+        analyser_contraintes_niveaux(config, cours_par_niveau, profs_for_matiere, prof_jours_off, prof_heures_off)
+        return None, config
+    
+    # Chaque cours est décrit par trois variables entières (professeur, salle,
+    # créneau) dont les domaines ne contiennent que les valeurs compatibles.
+    prof_cours = {}
+    salle_cours = {}
+    creneau_cours = {}
+    valeurs_salle_cours = {}
+    
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        couples = couples_prof_creneau[cours_id]
+        valeurs_salle = [salle_index[s] for s in salles_for_type[matiere_salle_req[matiere]]]
+        valeurs_salle_cours[cours_id] = valeurs_salle
         
-        for prof in liste_professeurs:
-            # Vérifier que le prof peut enseigner cette matière
-            if matiere not in professeurs[prof]:
-                continue
-            
-            # Vérifier les contraintes de disponibilité du professeur
-            prof_info = config["professeurs"][prof]
-            
-            for salle in liste_salles:
-                # Vérifier que la salle est du bon type
-                type_salle_requis = infos_matieres[matiere]['salle_requise']
-                if salles[salle]['type'] != type_salle_requis:
-                    continue
-                    
-                for jour in jours:
-                    # Vérifier si ce jour est autorisé pour le niveau du groupe
-                    if jour not in jours_autorises:
-                        continue
-                        
-                    # Vérifier si le professeur est disponible ce jour
-                    if jour in prof_info["contraintes"]["jours_indisponibles"]:
-                        continue
-                        
-                    for heure in heures:
-                        # Vérifier si cette heure est autorisée pour le niveau du groupe
-                        if heure not in heures_autorisees:
-                            continue
-                            
-                        # Vérifier si le professeur est disponible à cette heure
-                        if heure in prof_info["contraintes"]["heures_indisponibles"]:
-                            continue
-                            
-                        key = (groupe, matiere, cours_id, prof, salle, jour, heure)
-                        assignments[key] = model.NewBoolVar(f'assign_{cours_id}_{prof}_{salle}_{jour}_{heure}')
-
-    print(f"🔧 {len(assignments)} variables créées")
+        prof_cours[cours_id] = model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(sorted({p for p, _ in couples})), f'prof_{cours_id}' if debug_names else '')
+        creneau_cours[cours_id] = model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(sorted({c for _, c in couples})), f'creneau_{cours_id}' if debug_names else '')
+        salle_cours[cours_id] = model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(valeurs_salle), f'salle_{cours_id}' if debug_names else '')
 
     # ------------------
     # CONTRAINTES
     # ------------------
-    # C1: Chaque cours de la liste doit avoir lieu exactement une fois.
-    for (groupe, matiere, cours_id) in cours_a_planifier:
-        cours_vars = [assignments[key] for key in assignments if key[2] == cours_id]
-        if cours_vars:
-            model.AddExactlyOne(cours_vars)
-
+    # C1: Chaque cours a lieu exactement une fois (une seule valeur par variable),
+    # avec un professeur disponible sur le créneau choisi.
     # C2: Un professeur ne peut donner qu'un cours à la fois.
-    for prof in liste_professeurs:
-        for jour in jours:
-            for heure in heures:
-                prof_vars = [assignments[key] for key in assignments 
-                           if key[3] == prof and key[5] == jour and key[6] == heure]
-                if prof_vars:
-                    model.AddAtMostOne(prof_vars)
+    # Le couple (prof, créneau) est encodé en prof * nb_creneaux + créneau. Le
+    # domaine de ce code ne contient que les couples autorisés (C1), et les codes
+    # de tous les cours doivent être différents (C2).
+    prof_creneau = []
+    for cours_id, couples in couples_prof_creneau.items():
+        code = model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(sorted(p * nb_creneaux + c for p, c in couples)), '')
+        model.Add(code == prof_cours[cours_id] * nb_creneaux + creneau_cours[cours_id])
+        prof_creneau.append(code)
+    if len(prof_creneau) > 1:
+        model.AddAllDifferent(prof_creneau)
 
     # C3: Une salle ne peut être occupée que par un cours à la fois.
-    for salle in liste_salles:
-        for jour in jours:
-            for heure in heures:
-                salle_vars = [assignments[key] for key in assignments 
-                            if key[4] == salle and key[5] == jour and key[6] == heure]
-                if salle_vars:
-                    model.AddAtMostOne(salle_vars)
+    salle_creneau = []
+    for cours_id, valeurs_salle in valeurs_salle_cours.items():
+        creneaux_possibles = {c for _, c in couples_prof_creneau[cours_id]}
+        code = model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(sorted(s * nb_creneaux + c for s in valeurs_salle for c in creneaux_possibles)), '')
+        model.Add(code == salle_cours[cours_id] * nb_creneaux + creneau_cours[cours_id])
+        salle_creneau.append(code)
+    if len(salle_creneau) > 1:
+        model.AddAllDifferent(salle_creneau)
 
     # C4: Un groupe d'élèves ne peut assister qu'à un cours à la fois.
-    for groupe in groupes_eleves:
-        for jour in jours:
-            for heure in heures:
-                groupe_vars = [assignments[key] for key in assignments 
-                             if key[0] == groupe and key[5] == jour and key[6] == heure]
-                if groupe_vars:
-                    model.AddAtMostOne(groupe_vars)
+    creneaux_par_groupe = collections.defaultdict(list)
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        creneaux_par_groupe[groupe].append(creneau_cours[cours_id])
+    for creneaux_groupe in creneaux_par_groupe.values():
+        if len(creneaux_groupe) > 1:
+            model.AddAllDifferent(creneaux_groupe)
+
+    # C5: Coupes redondantes: un professeur ne peut pas donner plus de cours
+    # qu'il n'a de créneaux disponibles. Inutile si elle ne peut pas être serrée.
+    cours_candidats_prof = collections.defaultdict(list)
+    for cours_id, couples in couples_prof_creneau.items():
+        for p in {p for p, _ in couples}:
+            cours_candidats_prof[p].append(cours_id)
+    for p, cours_ids in cours_candidats_prof.items():
+        capacite = len(avail_slots[liste_professeurs[p]])
+        if len(cours_ids) <= capacite:
+            continue
+        affecte = []
+        for cours_id in cours_ids:
+            b = model.NewBoolVar('')
+            model.Add(prof_cours[cours_id] == p).OnlyEnforceIf(b)
+            model.Add(prof_cours[cours_id] != p).OnlyEnforceIf(b.Not())
+            affecte.append(b)
+        model.Add(sum(affecte) <= capacite)
+
+    # C6: Brisure de symétries.
+    # Les cours d'une même (groupe, matière) sont interchangeables, de même que
+    # deux groupes d'un même niveau (mêmes cours, mêmes créneaux autorisés).
+    # On impose un ordre sur leurs créneaux pour ne pas explorer de solutions équivalentes.
+    cours_par_groupe_matiere = collections.defaultdict(list)
+    premier_cours = {}
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        cours_par_groupe_matiere[(groupe, matiere)].append(cours_id)
+        premier_cours.setdefault(groupe, cours_id)
+
+    groupes_par_niveau = collections.defaultdict(list)
+    for groupe_info in config["groupes_eleves"]:
+        if groupe_info["nom"] in premier_cours:
+            groupes_par_niveau[groupe_info["niveau"]].append(groupe_info["nom"])
+
+    for cours_ids in cours_par_groupe_matiere.values():
+        for c1, c2 in zip(cours_ids, cours_ids[1:]):
+            model.Add(creneau_cours[c1] < creneau_cours[c2])
+
+    for groupes_niveau in groupes_par_niveau.values():
+        for g1, g2 in zip(groupes_niveau, groupes_niveau[1:]):
+            model.Add(creneau_cours[premier_cours[g1]] <= creneau_cours[premier_cours[g2]])
+
+    print(f"🔧 {len(model.Proto().variables)} variables créées")
 
     # ------------------
     # RÉSOLUTION
@@ -257,6 +433,22 @@ def create_schedule_from_config(config_path="schedule_config.json"):
     params = config["parametres_solveur"]
     solver.parameters.max_time_in_seconds = params["temps_max_seconds"]
     solver.parameters.log_search_progress = params["log_progression"]
+    solver.parameters.num_search_workers = params.get("num_workers", 8)
+    
+    for champ, defaut in REGLAGES_SOLVEUR_PAR_DEFAUT.items():
+        setattr(solver.parameters, champ, params.get(champ, defaut))
+    solver.parameters.search_branching = getattr(solver.parameters.SearchBranching,
+                                                 params.get("search_branching", "AUTOMATIC_SEARCH"))
+    
+    # Démarrage à chaud: une affectation gloutonne sert d'indication au solveur
+    if params.get("warm_start", True):
+        affectation = greedy_assign(cours_a_planifier, avail_slots, profs_for_matiere, salles_for_type,
+                                    infos_matieres, creneaux_autorises)
+        for cours_id, (prof, salle, creneau) in affectation.items():
+            model.AddHint(prof_cours[cours_id], prof_index[prof])
+            model.AddHint(salle_cours[cours_id], salle_index[salle])
+            model.AddHint(creneau_cours[cours_id], creneau)
+        print(f"💡 Démarrage à chaud: {len(affectation)}/{len(cours_a_planifier)} cours placés par l'heuristique gloutonne")
     
     print("🔍 Recherche d'une solution...")
     status = solver.Solve(model)
@@ -276,51 +468,22 @@ def create_schedule_from_config(config_path="schedule_config.json"):
         print(f"Nombre de branches: {solver.NumBranches()}")
         
         # Analyse des matières problématiques par niveau
-        print("\n--- Analyse des contraintes par niveau ---")
-        for niveau, curriculum_info in config["curriculum"].items():
-            print(f"\n🎓 Niveau {niveau}:")
-            jours_autorises = curriculum_info.get("jours_autorises", jours)
-            heures_autorisees = curriculum_info.get("heures_autorisees", heures)
-            creneaux_disponibles = len(jours_autorises) * len(heures_autorisees)
-            
-            print(f"   Créneaux disponibles: {creneaux_disponibles}")
-            print(f"   Jours autorisés: {', '.join(jours_autorises)}")
-            print(f"   Heures autorisées: {', '.join(heures_autorisees)}")
-            
-            cours_niveau = [c for c in cours_a_planifier 
-                           if any(g["nom"] == c[0] and g["niveau"] == niveau for g in config["groupes_eleves"])]
-            
-            if cours_niveau:
-                matieres_niveau = set(c[1] for c in cours_niveau)
-                for matiere in matieres_niveau:
-                    profs_competents = [p for p in professeurs if matiere in professeurs[p]]
-                    cours_matiere = len([c for c in cours_niveau if c[1] == matiere])
-                    salles_compatibles = [s for s in salles if salles[s]["type"] == infos_matieres[matiere]["salle_requise"]]
-                    
-                    # Vérifier les professeurs disponibles sur les créneaux du niveau
-                    profs_disponibles = []
-                    for prof in profs_competents:
-                        prof_info = config["professeurs"][prof]
-                        jours_prof_ok = [j for j in jours_autorises if j not in prof_info["contraintes"]["jours_indisponibles"]]
-                        heures_prof_ok = [h for h in heures_autorisees if h not in prof_info["contraintes"]["heures_indisponibles"]]
-                        if jours_prof_ok and heures_prof_ok:
-                            profs_disponibles.append(f"{prof}({len(jours_prof_ok)}j×{len(heures_prof_ok)}h)")
-                    
-                    print(f"   {matiere}: {cours_matiere} cours, {len(profs_competents)} prof(s) → {len(profs_disponibles)} disponible(s): {', '.join(profs_disponibles) if profs_disponibles else 'AUCUN!'}")
+        analyser_contraintes_niveaux(config, cours_par_niveau, profs_for_matiere, prof_jours_off, prof_heures_off)
         
-        return
+        return None, config
 
     # Préparation de la solution
     solution = collections.defaultdict(list)
-    for key, var in assignments.items():
-        if solver.Value(var) == 1:
-            groupe, matiere, cours_id, prof, salle, jour, heure = key
-            solution[groupe].append((jour, heure, matiere, prof, salle))
+    for (groupe, matiere, cours_id) in cours_a_planifier:
+        prof = liste_professeurs[solver.Value(prof_cours[cours_id])]
+        salle = liste_salles[solver.Value(salle_cours[cours_id])]
+        jour, heure = creneaux[solver.Value(creneau_cours[cours_id])]
+        solution[groupe].append((jour, heure, matiere, prof, salle))
     
     # Affichage par classe
-    for groupe in sorted(solution.keys()):
+    for groupe in sorted(solution):
         print(f"\n--- Emploi du temps pour la classe {groupe} ---")
-        schedule = sorted(solution[groupe], key=lambda x: (jours.index(x[0]), heures.index(x[1])))
+        schedule = sorted(solution[groupe], key=lambda x: creneau_index[(x[0], x[1])])
         for item in schedule:
             jour, heure, matiere, prof, salle = item
             emoji = config["matieres"][matiere].get("emoji", "")
@@ -332,7 +495,32 @@ def create_schedule_from_config(config_path="schedule_config.json"):
     # Vérification de la solution
     verifier_solution(solution, cours_a_planifier, professeurs, salles, infos_matieres, jours, heures)
     
-    return solution
+    return solution, config
+
+def occupation_salles(solution, config):
+    """
+    Parcourt la solution une seule fois pour construire:
+    - les salles occupées par créneau,
+    - l'occupant de chaque (créneau, salle): (groupe, matière, professeur),
+    - la matrice booléenne d'occupation salle × créneau, avec l'index des salles
+      et la liste des créneaux (jour, heure) correspondant à ses lignes et colonnes.
+    Les créneaux sont désignés par leur indice dans cette liste.
+    """
+    salle_to_idx = {salle: i for i, salle in enumerate(config["salles"])}
+    creneaux = [(j, h) for j in config["planning"]["jours"] for h in config["planning"]["heures"]]
+    creneau_to_idx = {creneau: i for i, creneau in enumerate(creneaux)}
+    
+    salles_occupees = collections.defaultdict(set)
+    occupant_map = {}
+    occ = np.zeros((len(salle_to_idx), len(creneaux)), dtype=bool)
+    for groupe, cours_list in solution.items():
+        for jour, heure, matiere, prof, salle in cours_list:
+            creneau = creneau_to_idx[(jour, heure)]
+            salles_occupees[creneau].add(salle)
+            occupant_map[(creneau, salle)] = (groupe, matiere, prof)
+            occ[salle_to_idx[salle], creneau] = True
+    
+    return salles_occupees, occupant_map, occ, salle_to_idx, creneaux
 
 def afficher_salles_libres(solution, config):
     """
@@ -346,68 +534,59 @@ def afficher_salles_libres(solution, config):
     heures = config["planning"]["heures"]
     salles = config["salles"]
     
-    # Créer un dictionnaire des salles occupées par créneau
-    salles_occupees = collections.defaultdict(set)
-    for groupe, cours_list in solution.items():
-        for jour, heure, matiere, prof, salle in cours_list:
-            salles_occupees[(jour, heure)].add(salle)
+    # Salles occupées par créneau, leur occupant, et matrice d'occupation
+    salles_occupees, occupant_map, occ, salle_to_idx, creneaux = occupation_salles(solution, config)
+    
+    all_salles = frozenset(salles)
     
     # Affichage par créneau
-    for jour in jours:
-        print(f"\n🗓️  {jour.upper()}")
-        print("-" * 50)
+    for creneau, (jour, heure) in enumerate(creneaux):
+        if creneau % len(heures) == 0:
+            print(f"\n🗓️  {jour.upper()}")
+            print("-" * 50)
         
-        for heure in heures:
-            creneau = (jour, heure)
-            salles_occupees_creneau = salles_occupees.get(creneau, set())
-            salles_libres = set(salles.keys()) - salles_occupees_creneau
-            
-            print(f"\n⏰ {heure}")
-            
-            # Salles occupées
-            if salles_occupees_creneau:
-                print("  🔴 Occupées:")
-                for salle in sorted(salles_occupees_creneau):
-                    # Trouver qui occupe cette salle
-                    occupant = None
-                    for groupe, cours_list in solution.items():
-                        for j, h, mat, prof, s in cours_list:
-                            if j == jour and h == heure and s == salle:
-                                occupant = f"{groupe} - {mat} ({prof})"
-                                break
-                        if occupant:
-                            break
-                    
-                    salle_type = salles[salle]["type"]
-                    capacite = salles[salle].get("capacite", "?")
-                    type_emoji = "💻" if salle_type == "computer_lab" else "🔬" if salle_type == "science_lab" else "📚"
-                    print(f"     • {salle:<12} {type_emoji} (cap: {capacite}) → {occupant}")
+        salles_occupees_creneau = salles_occupees.get(creneau, set())
+        salles_libres = all_salles - salles_occupees_creneau
+        
+        print(f"\n⏰ {heure}")
+        
+        # Salles occupées
+        if salles_occupees_creneau:
+            print("  🔴 Occupées:")
+            for salle in sorted(salles_occupees_creneau):
+                groupe, mat, prof = occupant_map[(creneau, salle)]
+                occupant = f"{groupe} - {mat} ({prof})"
+                
+                salle_type = salles[salle]["type"]
+                capacite = salles[salle].get("capacite", "?")
+                type_emoji = "💻" if salle_type == "computer_lab" else "🔬" if salle_type == "science_lab" else "📚"
+                print(f"     • {salle:<12} {type_emoji} (cap: {capacite}) → {occupant}")
+        
+        # Salles libres
+        if salles_libres:
+            print("  🟢 Libres:")
+            # Grouper par type
+            salles_par_type = collections.defaultdict(list)
+            for salle in salles_libres:
+                salle_type = salles[salle]["type"]
+                salles_par_type[salle_type].append(salle)
             
-            # Salles libres
-            if salles_libres:
-                print("  🟢 Libres:")
-                # Grouper par type
-                salles_par_type = collections.defaultdict(list)
-                for salle in salles_libres:
-                    salle_type = salles[salle]["type"]
-                    salles_par_type[salle_type].append(salle)
+            for type_salle, liste_salles in sorted(salles_par_type.items()):
+                type_emoji = "💻" if type_salle == "computer_lab" else "🔬" if type_salle == "science_lab" else "📚"
+                type_nom = {
+                    "standard": "Standard",
+                    "computer_lab": "Informatique",
+                    "science_lab": "Sciences"
+                }.get(type_salle, type_salle)
                 
-                for type_salle, liste_salles in sorted(salles_par_type.items()):
-                    type_emoji = "💻" if type_salle == "computer_lab" else "🔬" if type_salle == "science_lab" else "📚"
-                    type_nom = {
-                        "standard": "Standard",
-                        "computer_lab": "Informatique",
-                        "science_lab": "Sciences"
-                    }.get(type_salle, type_salle)
-                    
-                    for salle in sorted(liste_salles):
-                        capacite = salles[salle].get("capacite", "?")
-                        equipements = ", ".join(salles[salle].get("equipements", []))
-                        print(f"     • {salle:<12} {type_emoji} (cap: {capacite}) {type_nom}")
-                        if equipements:
-                            print(f"       └─ Équipements: {equipements}")
-            else:
-                print("  🔴 Toutes les salles sont occupées")
+                for salle in sorted(liste_salles):
+                    capacite = salles[salle].get("capacite", "?")
+                    equipements = ", ".join(salles[salle].get("equipements", []))
+                    print(f"     • {salle:<12} {type_emoji} (cap: {capacite}) {type_nom}")
+                    if equipements:
+                        print(f"       └─ Équipements: {equipements}")
+        else:
+            print("  🔴 Toutes les salles sont occupées")
     
     # Statistiques globales
     print(f"\n" + "="*60)
@@ -419,33 +598,32 @@ def afficher_salles_libres(solution, config):
     total_creneaux_salles = total_creneaux * total_salles
     
     # Calculer le taux d'occupation par salle
-    occupation_par_salle = collections.defaultdict(int)
-    for creneau, salles_occ in salles_occupees.items():
-        for salle in salles_occ:
-            occupation_par_salle[salle] += 1
+    per_salle = occ.sum(axis=1)
+    taux_par_salle = per_salle / total_creneaux * 100
     
     print(f"\n🏢 Occupation par salle:")
-    for salle in sorted(salles.keys()):
-        nb_occupations = occupation_par_salle[salle]
-        taux = (nb_occupations / total_creneaux) * 100
+    for salle in sorted(salles):
+        nb_occupations = per_salle[salle_to_idx[salle]]
+        taux = taux_par_salle[salle_to_idx[salle]]
         barre = "█" * int(taux // 5) + "░" * (20 - int(taux // 5))
         salle_type = salles[salle]["type"]
         type_emoji = "💻" if salle_type == "computer_lab" else "🔬" if salle_type == "science_lab" else "📚"
         print(f"  {salle:<12} {type_emoji} │{barre}│ {taux:5.1f}% ({nb_occupations}/{total_creneaux})")
     
     # Taux global
-    total_occupations = sum(len(salles_occ) for salles_occ in salles_occupees.values())
+    total_occupations = int(per_salle.sum())
     taux_global = (total_occupations / total_creneaux_salles) * 100
     print(f"\n🎯 Taux d'occupation global: {taux_global:.1f}% ({total_occupations}/{total_creneaux_salles} créneaux-salles)")
     
-    # Créneaux les plus/moins chargés
-    occupation_par_creneau = {creneau: len(salles_occ) for creneau, salles_occ in salles_occupees.items()}
-    if occupation_par_creneau:
-        creneau_max = max(occupation_par_creneau.items(), key=lambda x: x[1])
-        creneau_min = min(occupation_par_creneau.items(), key=lambda x: x[1])
+    # Créneaux les plus/moins chargés (parmi les créneaux occupés)
+    per_creneau = occ.sum(axis=0)
+    creneaux_occupes = np.flatnonzero(per_creneau)
+    if creneaux_occupes.size:
+        i_max = creneaux_occupes[per_creneau[creneaux_occupes].argmax()]
+        i_min = creneaux_occupes[per_creneau[creneaux_occupes].argmin()]
         
-        print(f"\n⚡ Créneau le plus chargé: {creneau_max[0][0]} {creneau_max[0][1]} ({creneau_max[1]}/{total_salles} salles)")
-        print(f"💤 Créneau le moins chargé: {creneau_min[0][0]} {creneau_min[0][1]} ({creneau_min[1]}/{total_salles} salles)")
+        print(f"\n⚡ Créneau le plus chargé: {creneaux[i_max][0]} {creneaux[i_max][1]} ({per_creneau[i_max]}/{total_salles} salles)")
+        print(f"💤 Créneau le moins chargé: {creneaux[i_min][0]} {creneaux[i_min][1]} ({per_creneau[i_min]}/{total_salles} salles)")
 
 
 def verifier_solution(solution, cours_planifies, professeurs, salles, infos_matieres, jours, heures):
@@ -504,6 +682,17 @@ def verifier_solution(solution, cours_planifies, professeurs, salles, infos_mati
     
     return is_valid
 
+def ecrire_json(data, output_path):
+    """
+    Écrit les données en JSON indenté, avec orjson s'il est installé.
+    """
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 def export_schedule_to_json(solution, config, output_path="emploi_du_temps_genere.json"):
     """
     Exporte l'emploi du temps généré vers un fichier JSON.
@@ -530,8 +719,7 @@ def export_schedule_to_json(solution, config, output_path="emploi_du_temps_gener
             })
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        ecrire_json(export_data, output_path)
         print(f"💾 Emploi du temps exporté vers {output_path}")
     except Exception as e:
         print(f"❌ Erreur lors de l'export: {e}")
@@ -547,19 +735,8 @@ def export_salles_libres_to_json(solution, config, output_path="salles_libres.js
     heures = config["planning"]["heures"]
     salles = config["salles"]
     
-    # Créer un dictionnaire des salles occupées par créneau
-    salles_occupees = collections.defaultdict(set)
-    occupation_details = collections.defaultdict(dict)
-    
-    for groupe, cours_list in solution.items():
-        for jour, heure, matiere, prof, salle in cours_list:
-            creneau = f"{jour} {heure}"
-            salles_occupees[(jour, heure)].add(salle)
-            occupation_details[creneau][salle] = {
-                "groupe": groupe,
-                "matiere": matiere,
-                "professeur": prof
-            }
+    # Salles occupées par créneau, leur occupant, et matrice d'occupation
+    salles_occupees, occupant_map, occ, salle_to_idx, creneaux = occupation_salles(solution, config)
     
     export_data = {
         "etablissement": config["etablissement"],
@@ -572,53 +749,59 @@ def export_salles_libres_to_json(solution, config, output_path="salles_libres.js
         }
     }
     
+    all_salles = frozenset(salles)
+    
     # Données par créneau
-    for jour in jours:
-        for heure in heures:
-            creneau = f"{jour} {heure}"
-            salles_occupees_creneau = salles_occupees.get((jour, heure), set())
-            salles_libres = set(salles.keys()) - salles_occupees_creneau
-            
-            export_data["disponibilite_salles"][creneau] = {
-                "jour": jour,
-                "heure": heure,
-                "salles_occupees": [],
-                "salles_libres": []
+    for creneau, (jour, heure) in enumerate(creneaux):
+        nom_creneau = f"{jour} {heure}"
+        salles_occupees_creneau = salles_occupees.get(creneau, set())
+        salles_libres = all_salles - salles_occupees_creneau
+        
+        export_data["disponibilite_salles"][nom_creneau] = {
+            "jour": jour,
+            "heure": heure,
+            "salles_occupees": [],
+            "salles_libres": []
+        }
+        
+        # Salles occupées avec détails
+        for salle in sorted(salles_occupees_creneau):
+            groupe, matiere, prof = occupant_map[(creneau, salle)]
+            details = {
+                "groupe": groupe,
+                "matiere": matiere,
+                "professeur": prof
             }
-            
-            # Salles occupées avec détails
-            for salle in sorted(salles_occupees_creneau):
-                details = occupation_details[creneau].get(salle, {})
-                export_data["disponibilite_salles"][creneau]["salles_occupees"].append({
-                    "nom": salle,
-                    "type": salles[salle]["type"],
-                    "capacite": salles[salle].get("capacite"),
-                    "occupe_par": details
-                })
-            
-            # Salles libres avec détails
-            for salle in sorted(salles_libres):
-                export_data["disponibilite_salles"][creneau]["salles_libres"].append({
-                    "nom": salle,
-                    "type": salles[salle]["type"],
-                    "capacite": salles[salle].get("capacite"),
-                    "equipements": salles[salle].get("equipements", [])
-                })
+            export_data["disponibilite_salles"][nom_creneau]["salles_occupees"].append({
+                "nom": salle,
+                "type": salles[salle]["type"],
+                "capacite": salles[salle].get("capacite"),
+                "occupe_par": details
+            })
+        
+        # Salles libres avec détails
+        for salle in sorted(salles_libres):
+            export_data["disponibilite_salles"][nom_creneau]["salles_libres"].append({
+                "nom": salle,
+                "type": salles[salle]["type"],
+                "capacite": salles[salle].get("capacite"),
+                "equipements": salles[salle].get("equipements", [])
+            })
     
     # Statistiques d'occupation par salle
     total_creneaux = len(jours) * len(heures)
-    for salle in salles.keys():
-        nb_occupations = sum(1 for salles_occ in salles_occupees.values() if salle in salles_occ)
-        taux = (nb_occupations / total_creneaux) * 100
+    per_salle = occ.sum(axis=1)
+    taux_par_salle = per_salle / total_creneaux * 100
+    for salle in salles:
+        i = salle_to_idx[salle]
         export_data["statistiques"]["occupation_par_salle"][salle] = {
-            "occupations": nb_occupations,
+            "occupations": int(per_salle[i]),
             "total_creneaux": total_creneaux,
-            "taux_occupation": round(taux, 1)
+            "taux_occupation": round(float(taux_par_salle[i]), 1)
         }
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        ecrire_json(export_data, output_path)
         print(f"🏢 Disponibilité des salles exportée vers {output_path}")
     except Exception as e:
         print(f"❌ Erreur lors de l'export des salles: {e}")
@@ -626,10 +809,9 @@ def export_salles_libres_to_json(solution, config, output_path="salles_libres.js
 
 if __name__ == '__main__':
     # Génération de l'emploi du temps
-    solution = create_schedule_from_config("schedule_config.json")
+    solution, config = create_schedule_from_config("schedule_config.json")
     
     # Export optionnel vers JSON
     if solution:
-        config = load_config("schedule_config.json")
         export_schedule_to_json(solution, config)
         export_salles_libres_to_json(solution, config)
\ No newline at end of file